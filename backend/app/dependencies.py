@@ -0,0 +1,51 @@
+import os
+
+from fastapi import Depends, HTTPException, Request
+
+from app.utils.file_manager import FileManager
+from app.utils.namespaces import NamespaceRegistry
+from app.utils.watcher import StoreWatcher
+
+# Default namespace, served under /api/<store>/
+file_manager = FileManager()
+
+def make_watcher(file_manager: FileManager) -> StoreWatcher:
+    # Set SYMBOLS_INGEST_TXT=1 to import hand edits of the txt files instead of overwriting them,
+    # and SYMBOLS_INGEST_TXT_ALLOW_REMOVALS=1 to accept edits that remove most of a store
+    return StoreWatcher(
+        file_manager,
+        ingest_txt=os.environ.get("SYMBOLS_INGEST_TXT") == "1",
+        allow_mass_removal=os.environ.get("SYMBOLS_INGEST_TXT_ALLOW_REMOVALS") == "1"
+    )
+
+watcher = make_watcher(file_manager)
+
+# Named namespaces, served under /api/ns/{namespace}/<store>/, each watched while loaded
+namespaces = NamespaceRegistry(
+    root=os.environ.get("SYMBOLS_NAMESPACES_DIR", "namespaces"),
+    memory_budget=int(os.environ.get("SYMBOLS_NAMESPACE_BUDGET_MB", "64")) * 1024 * 1024,
+    max_loaded=int(os.environ["SYMBOLS_NAMESPACE_MAX_LOADED"]) if os.environ.get("SYMBOLS_NAMESPACE_MAX_LOADED") else None,
+    watcher_factory=make_watcher
+)
+
+def get_file_manager(request: Request) -> FileManager:
+    """FileManager of the namespace in the request path, or the default one"""
+    namespace = request.path_params.get("namespace")
+    if namespace is None:
+        return file_manager
+    try:
+        return namespaces.get(namespace)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def get_watcher(request: Request, file_manager: FileManager = Depends(get_file_manager)) -> StoreWatcher:
+    """Watcher of the namespace in the request path, or the default one"""
+    namespace = request.path_params.get("namespace")
+    if namespace is None:
+        return watcher
+    namespace_watcher = namespaces.watcher(namespace)
+    if namespace_watcher is None:
+        raise HTTPException(status_code=404, detail=f"Namespace {namespace} is not being watched")
+    return namespace_watcher
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import dex, cex, futures, files
+from app.dependencies import namespaces as namespace_registry, watcher
+from app.routers import dex, cex, futures, files, namespaces
 
 app = FastAPI(
     title="Crypto Symbols Manager API",
@@ -18,11 +19,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(dex.router)
-app.include_router(cex.router)
-app.include_router(futures.router)
-app.include_router(files.router)
+# Include routers, once for the default namespace and once per named namespace
+for prefix in ["/api", "/api/ns/{namespace}"]:
+    app.include_router(dex.router, prefix=f"{prefix}/dex")
+    app.include_router(cex.router, prefix=f"{prefix}/cex")
+    app.include_router(futures.router, prefix=f"{prefix}/futures")
+    app.include_router(files.router, prefix=f"{prefix}/files")
+app.include_router(files.process_router, prefix="/api/files")
+app.include_router(namespaces.router)
+
+@app.on_event("startup")
+def start_watcher():
+    watcher.start()
+
+@app.on_event("shutdown")
+def stop_watchers():
+    watcher.stop()
+    namespace_registry.close()
 
 @app.get("/")
 async def root():
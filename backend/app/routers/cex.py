@@ -1,20 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 
 from app.models.symbols import CEXSymbol, CEXSymbolRequest
+from app.dependencies import get_file_manager
 from app.utils.file_manager import FileManager
 
-router = APIRouter(prefix="/api/cex", tags=["CEX"])
-file_manager = FileManager()
+router = APIRouter(tags=["CEX"])
 
 @router.get("/symbols", response_model=List[CEXSymbol])
-async def get_cex_symbols():
+def get_cex_symbols(file_manager: FileManager = Depends(get_file_manager)):
     """Get all CEX symbols"""
+    # Sync handler so concurrent reads run in the threadpool and share one load
     data = file_manager.read_cex_data()
     return data.symbols
 
 @router.post("/symbols", response_model=CEXSymbol)
-async def add_cex_symbol(symbol: CEXSymbolRequest):
+def add_cex_symbol(symbol: CEXSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Add a new CEX symbol"""
     try:
         return file_manager.add_cex_symbol(symbol.dict())
@@ -22,7 +23,7 @@ async def add_cex_symbol(symbol: CEXSymbolRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/symbols/{symbol_id}", response_model=CEXSymbol)
-async def update_cex_symbol(symbol_id: str, symbol: CEXSymbolRequest):
+def update_cex_symbol(symbol_id: str, symbol: CEXSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Update an existing CEX symbol"""
     try:
         return file_manager.update_cex_symbol(symbol_id, symbol.dict())
@@ -30,7 +31,7 @@ async def update_cex_symbol(symbol_id: str, symbol: CEXSymbolRequest):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.delete("/symbols/{symbol_id}")
-async def delete_cex_symbol(symbol_id: str):
+def delete_cex_symbol(symbol_id: str, file_manager: FileManager = Depends(get_file_manager)):
     """Delete a CEX symbol"""
     try:
         file_manager.delete_cex_symbol(symbol_id)
@@ -39,8 +40,8 @@ async def delete_cex_symbol(symbol_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/generate-file")
-async def regenerate_cex_file():
+def regenerate_cex_file(file_manager: FileManager = Depends(get_file_manager)):
     """Force regenerate cex_symbols.txt"""
-    data = file_manager.read_cex_data()
-    file_manager.generate_cex_file(data.symbols)
+    # Sync handler so concurrent requests run in the threadpool and can join one regeneration
+    file_manager.regenerate_cex_file()
     return {"message": "CEX file regenerated successfully"}
\ No newline at end of file
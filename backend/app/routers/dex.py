@@ -1,20 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 
 from app.models.symbols import DEXSymbol, DEXSymbolRequest
+from app.dependencies import get_file_manager
 from app.utils.file_manager import FileManager
 
-router = APIRouter(prefix="/api/dex", tags=["DEX"])
-file_manager = FileManager()
+router = APIRouter(tags=["DEX"])
 
 @router.get("/symbols", response_model=List[DEXSymbol])
-async def get_dex_symbols():
+def get_dex_symbols(file_manager: FileManager = Depends(get_file_manager)):
     """Get all DEX symbols"""
+    # Sync handler so concurrent reads run in the threadpool and share one load
     data = file_manager.read_dex_data()
     return data.symbols
 
 @router.post("/symbols", response_model=DEXSymbol)
-async def add_dex_symbol(symbol: DEXSymbolRequest):
+def add_dex_symbol(symbol: DEXSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Add a new DEX symbol"""
     try:
         return file_manager.add_dex_symbol(symbol.dict())
@@ -22,7 +23,7 @@ async def add_dex_symbol(symbol: DEXSymbolRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/symbols/{symbol_id}", response_model=DEXSymbol)
-async def update_dex_symbol(symbol_id: str, symbol: DEXSymbolRequest):
+def update_dex_symbol(symbol_id: str, symbol: DEXSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Update an existing DEX symbol"""
     try:
         return file_manager.update_dex_symbol(symbol_id, symbol.dict())
@@ -30,7 +31,7 @@ async def update_dex_symbol(symbol_id: str, symbol: DEXSymbolRequest):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.delete("/symbols/{symbol_id}")
-async def delete_dex_symbol(symbol_id: str):
+def delete_dex_symbol(symbol_id: str, file_manager: FileManager = Depends(get_file_manager)):
     """Delete a DEX symbol"""
     try:
         file_manager.delete_dex_symbol(symbol_id)
@@ -39,8 +40,8 @@ async def delete_dex_symbol(symbol_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/generate-file")
-async def regenerate_dex_file():
+def regenerate_dex_file(file_manager: FileManager = Depends(get_file_manager)):
     """Force regenerate pooladdress.txt"""
-    data = file_manager.read_dex_data()
-    file_manager.generate_dex_file(data.symbols)
+    # Sync handler so concurrent requests run in the threadpool and can join one regeneration
+    file_manager.regenerate_dex_file()
     return {"message": "DEX file regenerated successfully"}
\ No newline at end of file
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from datetime import datetime
 
 from app.models.symbols import FileStatus
+from app.dependencies import get_file_manager, get_watcher
+from app.utils.watcher import StoreWatcher
 from app.utils.file_manager import FileManager
 
-router = APIRouter(prefix="/api/files", tags=["Files"])
-file_manager = FileManager()
+router = APIRouter(tags=["Files"])
+# Process-wide endpoints, only mounted for the default namespace
+process_router = APIRouter(tags=["Files"])
 
 @router.get("/download/{file_type}")
-async def download_file(file_type: str):
+async def download_file(file_type: str, file_manager: FileManager = Depends(get_file_manager)):
     """Download generated txt files"""
     if file_type == "pooladdress":
         if file_manager.pooladdress_file.exists():
@@ -36,7 +39,7 @@ async def download_file(file_type: str):
     raise HTTPException(status_code=404, detail="File not found")
 
 @router.get("/status", response_model=FileStatus)
-async def get_file_status():
+def get_file_status(file_manager: FileManager = Depends(get_file_manager)):
     """Get file information and statistics"""
     dex_data = file_manager.read_dex_data()
     cex_data = file_manager.read_cex_data()
@@ -56,7 +59,7 @@ async def get_file_status():
     )
 
 @router.get("/content/{file_type}")
-async def get_file_content(file_type: str):
+async def get_file_content(file_type: str, file_manager: FileManager = Depends(get_file_manager)):
     """Get file contents as text for preview"""
     if file_type == "pooladdress":
         if file_manager.pooladdress_file.exists():
@@ -74,12 +77,20 @@ async def get_file_content(file_type: str):
     raise HTTPException(status_code=404, detail="File not found")
 
 @router.post("/backup/create")
-async def create_backup():
+def create_backup(file_manager: FileManager = Depends(get_file_manager)):
     """Create backup of current data"""
     try:
-        file_manager.create_backup('dex')
-        file_manager.create_backup('cex')
-        file_manager.create_backup('futures')
+        file_manager.create_all_backups()
         return {"message": "Backup created successfully", "timestamp": datetime.now().isoformat()}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to create backup: {str(e)}")
+
+@process_router.get("/metrics")
+async def get_coalescing_metrics(file_manager: FileManager = Depends(get_file_manager)):
+    """Get counts of deduplicated reads, regenerations and backups"""
+    return file_manager.get_coalescing_stats()
+
+@router.get("/watcher")
+async def get_watcher_status(watcher: StoreWatcher = Depends(get_watcher)):
+    """Get the state of the watcher for external file edits"""
+    return watcher.status()
\ No newline at end of file
@@ -1,17 +1,16 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import List
-import uuid
-from datetime import datetime
 
-from app.models.symbols import FuturesSymbol, FuturesSymbolRequest, FuturesData
+from app.models.symbols import FuturesSymbol, FuturesSymbolRequest
+from app.dependencies import get_file_manager
 from app.utils.file_manager import FileManager
 
-router = APIRouter(prefix="/api/futures", tags=["futures"])
-file_manager = FileManager()
+router = APIRouter(tags=["futures"])
 
 @router.get("/symbols", response_model=List[FuturesSymbol])
-async def get_futures_symbols():
+def get_futures_symbols(file_manager: FileManager = Depends(get_file_manager)):
     """Get all futures symbols"""
+    # Sync handler so concurrent reads run in the threadpool and share one load
     try:
         data = file_manager.read_futures_data()
         return data.symbols
@@ -19,108 +18,39 @@ async def get_futures_symbols():
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/symbols", response_model=FuturesSymbol)
-async def add_futures_symbol(symbol: FuturesSymbolRequest):
+def add_futures_symbol(symbol: FuturesSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Add a new futures symbol"""
     try:
-        # Create backup before modifying
-        file_manager.create_backup('futures')
-        
-        # Read current data
-        data = file_manager.read_futures_data()
-        
-        # Create new symbol
-        new_symbol = FuturesSymbol(
-            id=str(uuid.uuid4()),
-            symbol=symbol.symbol,
-            ticker=symbol.ticker,
-            exchange=symbol.exchange,
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat()
-        )
-        
-        # Add to data
-        data.symbols.append(new_symbol)
-        data.last_updated = datetime.now().isoformat()
-        data.version += 1
-        
-        # Save data
-        file_manager.write_futures_data(data)
-        
-        # Generate futures file
-        file_manager.generate_futures_file(data.symbols)
-        
-        return new_symbol
+        return file_manager.add_futures_symbol(symbol.dict())
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/symbols/{symbol_id}", response_model=FuturesSymbol)
-async def update_futures_symbol(symbol_id: str, symbol: FuturesSymbolRequest):
+def update_futures_symbol(symbol_id: str, symbol: FuturesSymbolRequest, file_manager: FileManager = Depends(get_file_manager)):
     """Update an existing futures symbol"""
     try:
-        # Create backup before modifying
-        file_manager.create_backup('futures')
-        
-        # Read current data
-        data = file_manager.read_futures_data()
-        
-        # Find and update symbol
-        for i, s in enumerate(data.symbols):
-            if s.id == symbol_id:
-                updated_symbol = FuturesSymbol(
-                    id=symbol_id,
-                    symbol=symbol.symbol,
-                    ticker=symbol.ticker,
-                    exchange=symbol.exchange,
-                    created_at=s.created_at,
-                    updated_at=datetime.now().isoformat()
-                )
-                data.symbols[i] = updated_symbol
-                data.last_updated = datetime.now().isoformat()
-                data.version += 1
-                
-                # Save data
-                file_manager.write_futures_data(data)
-                
-                # Generate futures file
-                file_manager.generate_futures_file(data.symbols)
-                
-                return updated_symbol
-        
-        raise HTTPException(status_code=404, detail="Symbol not found")
+        return file_manager.update_futures_symbol(symbol_id, symbol.dict())
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/symbols/{symbol_id}")
-async def delete_futures_symbol(symbol_id: str):
+def delete_futures_symbol(symbol_id: str, file_manager: FileManager = Depends(get_file_manager)):
     """Delete a futures symbol"""
     try:
-        # Create backup before modifying
-        file_manager.create_backup('futures')
-        
-        # Read current data
-        data = file_manager.read_futures_data()
-        
-        # Remove symbol
-        data.symbols = [s for s in data.symbols if s.id != symbol_id]
-        data.last_updated = datetime.now().isoformat()
-        data.version += 1
-        
-        # Save data
-        file_manager.write_futures_data(data)
-        
-        # Generate futures file
-        file_manager.generate_futures_file(data.symbols)
-        
+        file_manager.delete_futures_symbol(symbol_id)
         return {"message": "Symbol deleted successfully"}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/generate-file")
-async def regenerate_futures_file():
+def regenerate_futures_file(file_manager: FileManager = Depends(get_file_manager)):
     """Regenerate the futures_symbols.txt file"""
     try:
-        data = file_manager.read_futures_data()
-        file_manager.generate_futures_file(data.symbols)
+        file_manager.regenerate_futures_file()
         return {"message": "Futures file regenerated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, HTTPException
+
+from app.dependencies import namespaces
+
+router = APIRouter(prefix="/api/ns", tags=["Namespaces"])
+
+@router.get("")
+async def get_namespaces():
+    """List namespaces and which of them are currently loaded"""
+    return namespaces.status()
+
+@router.post("/{namespace}", status_code=201)
+def create_namespace(namespace: str):
+    """Create a namespace with empty stores"""
+    try:
+        namespaces.create(namespace)
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": f"Namespace {namespace} created successfully"}
\ No newline at end of file
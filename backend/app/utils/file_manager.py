@@ -1,34 +1,138 @@
 import json
 import os
+import re
 import shutil
+import sys
+import threading
+from contextlib import ExitStack
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional
 from pathlib import Path
 import uuid
 
 from app.models.symbols import DEXSymbol, CEXSymbol, FuturesSymbol, DEXData, CEXData, FuturesData
+from app.utils.single_flight import single_flight
+
+DEX_FILE_HEADER = [
+    "# Pool addresses for different DEXes",
+    "# Format: dex_type:pool_address:pool_name:altcoin_quantity", 
+    "# Supported dex_types: uniswap_v2, uniswap_v3, sushiswap_v2, sushiswap_v3",
+    "# altcoin_quantity: How many altcoins you want to exchange for WETH",
+    "",
+    "# Working pools (add your desired altcoin quantities)"
+]
+
+# Field each store is partitioned on, and the models for each store
+SHARD_FIELDS = {'dex': 'dex_type', 'cex': 'exchange_name', 'futures': 'exchange'}
+SYMBOL_MODELS = {'dex': DEXSymbol, 'cex': CEXSymbol, 'futures': FuturesSymbol}
+DATA_MODELS = {'dex': DEXData, 'cex': CEXData, 'futures': FuturesData}
+STORE_LABELS = {'dex': 'DEX', 'cex': 'CEX', 'futures': 'Futures'}
+
+# Locks are keyed by resolved path and shared process-wide, because every
+# router holds its own FileManager over the same data directory.
+# Reentrant so a whole-store lock can be held around writes that lock shards themselves.
+_path_locks: Dict[str, threading.RLock] = {}
+_path_locks_guard = threading.Lock()
+
+# (inode, mtime, size) of the last file this process wrote at each path, so the
+# watcher can tell our own writes apart from external edits.
+_own_writes: Dict[str, tuple] = {}
+
+# Pool addresses being added to a partitioned DEX store, keyed by resolved
+# shards directory and guarded by that directory's lock. An address stays
+# reserved until its shard is written, so adds to two shards cannot both pass
+# the uniqueness check while only the shard write is serialized per shard.
+_pending_addresses: Dict[str, set] = {}
+
+def _lock_for(path: Path) -> threading.RLock:
+    key = str(path.resolve())
+    with _path_locks_guard:
+        if key not in _path_locks:
+            _path_locks[key] = threading.RLock()
+        return _path_locks[key]
+
+def file_signature(path: Path) -> Optional[tuple]:
+    """Identify a file version by (inode, mtime, size), or None if it is missing"""
+    try:
+        stat = path.stat()
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+def is_own_write(path: Path) -> bool:
+    """Whether the file at path is exactly what this process last wrote there"""
+    signature = file_signature(path)
+    return signature is not None and _own_writes.get(str(path.resolve())) == signature
+
+def estimate_size(data) -> int:
+    """Estimate the memory held by a parsed store: the models, their field dicts and values"""
+    total = sys.getsizeof(data) + sys.getsizeof(data.__dict__) + sys.getsizeof(data.symbols)
+    for symbol in data.symbols:
+        total += sys.getsizeof(symbol) + sys.getsizeof(symbol.__dict__)
+        total += sys.getsizeof(symbol.__pydantic_fields_set__)
+        total += sum(sys.getsizeof(value) for value in symbol.__dict__.values())
+    return total
+
+def write_text_file(path: Path, content: str):
+    """Atomically replace path with content and remember it as our own write"""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    # Rename keeps inode and mtime, so the signature is known before the file appears
+    _own_writes[str(path.resolve())] = file_signature(tmp_path)
+    os.replace(tmp_path, path)
 
 class FileManager:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", partitioned: Optional[bool] = None, output_dir: str = ".", sync_txt: bool = True):
         self.data_dir = Path(data_dir)
         self.dex_file = self.data_dir / "dex_symbols.json"
         self.cex_file = self.data_dir / "cex_symbols.json"
         self.futures_file = self.data_dir / "futures_symbols.json"
         self.generated_dir = self.data_dir / "generated"
         self.backups_dir = self.data_dir / "backups"
+        # Partitioned layout: one JSON file per exchange / dex_type under shards/<store>/
+        self.shards_dir = self.data_dir / "shards"
+        self.shard_backups_dir = self.backups_dir / "shards"
+        # Per-store amount added to the sum of shard versions, so the merged
+        # version carries over from migration and survives removed shards
+        self.version_offsets_file = self.shards_dir / "version_offsets.json"
         # Save txt files to current directory instead of generated folder
-        self.pooladdress_file = Path("pooladdress.txt")
-        self.cex_symbols_file = Path("cex_symbols.txt")
-        self.futures_symbols_file = Path("futures_symbols.txt")
+        self.output_dir = Path(output_dir)
+        self.pooladdress_file = self.output_dir / "pooladdress.txt"
+        self.cex_symbols_file = self.output_dir / "cex_symbols.txt"
+        self.futures_symbols_file = self.output_dir / "futures_symbols.txt"
+        self.txt_files = {
+            'dex': self.pooladdress_file,
+            'cex': self.cex_symbols_file,
+            'futures': self.futures_symbols_file
+        }
         
-        self.initialize_directories()
+        # Parsed stores keyed by path, reused while the file signature is unchanged
+        self._cache: Dict[str, tuple] = {}
+        
+        # Default to whichever layout is already on disk
+        if partitioned is None:
+            partitioned = self.shards_dir.is_dir()
+        self.partitioned = partitioned
+        
+        self.initialize_directories(sync_txt)
     
-    def initialize_directories(self):
+    def initialize_directories(self, sync_txt: bool = True):
         """Create necessary directories and files if they don't exist"""
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
         self.generated_dir.mkdir(exist_ok=True)
         self.backups_dir.mkdir(exist_ok=True)
         
+        if self.partitioned:
+            for kind in SHARD_FIELDS:
+                (self.shards_dir / kind).mkdir(parents=True, exist_ok=True)
+                (self.shard_backups_dir / kind).mkdir(parents=True, exist_ok=True)
+                (self.generated_dir / kind).mkdir(exist_ok=True)
+            if sync_txt:
+                self.sync_txt_files()
+            return
+        
         # Initialize empty JSON files if they don't exist
         if not self.dex_file.exists():
             self.write_dex_data(DEXData(symbols=[], last_updated=datetime.now().isoformat(), version=1))
@@ -40,10 +144,17 @@ class FileManager:
             self.write_futures_data(FuturesData(symbols=[], last_updated=datetime.now().isoformat(), version=1))
         
         # Generate txt files from existing JSON data on startup
-        self.sync_txt_files()
+        if sync_txt:
+            self.sync_txt_files()
     
     def create_backup(self, file_type: str):
         """Create a backup of the specified file type"""
+        if self.partitioned:
+            if file_type in SHARD_FIELDS:
+                for shard in self._shard_names(file_type):
+                    self._backup_file(self._shard_path(file_type, shard), self.shard_backups_dir / file_type)
+            return
+        
         file_map = {
             'dex': self.dex_file,
             'cex': self.cex_file,
@@ -51,20 +162,75 @@ class FileManager:
         }
         
         file_path = file_map.get(file_type)
-        if file_path and file_path.exists():
+        if file_path:
+            self._backup_file(file_path, self.backups_dir)
+    
+    def _backup_file(self, file_path: Path, backups_dir: Path, contents: Optional[str] = None):
+        """Copy file_path (or the given contents for it) into backups_dir, keeping its last 10 backups"""
+        if contents is not None or file_path.exists():
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_name = f"{file_path.stem}_{timestamp}.json"
-            backup_path = self.backups_dir / backup_name
-            shutil.copy2(file_path, backup_path)
+            backup_path = backups_dir / backup_name
+            if contents is None:
+                shutil.copy2(file_path, backup_path)
+            else:
+                write_text_file(backup_path, contents)
             
-            # Keep only last 10 backups
-            backups = sorted(self.backups_dir.glob(f"{file_path.stem}_*.json"))
+            # Keep only last 10 backups; match the timestamp exactly so shard
+            # "gate" does not count the backups of shard "gate_io"
+            pattern = re.compile(rf"^{re.escape(file_path.stem)}_\d{{8}}_\d{{6}}\.json$")
+            backups = sorted(path for path in backups_dir.glob(f"{file_path.stem}_*.json") if pattern.match(path.name))
             if len(backups) > 10:
                 for old_backup in backups[:-10]:
                     old_backup.unlink()
     
+    def create_all_backups(self):
+        """Back up every data file, joining a backup job already in progress"""
+        def run():
+            self.create_backup('dex')
+            self.create_backup('cex')
+            self.create_backup('futures')
+        
+        single_flight.do(('backup', str(self.backups_dir.resolve())), run, group='backup')
+    
+    def _read_store(self, file_path: Path, loader):
+        """Load a store file, reusing the cached copy while the file is unchanged.
+
+        Concurrent loads of the same file version share one execution. Callers
+        replace, append or pop symbols before writing the result back but never
+        change a symbol in place, so each gets its own copy of the store and of
+        the symbols list while the symbols themselves are shared.
+        """
+        key = str(file_path.resolve())
+        signature = file_signature(file_path)
+        cached = self._cache.get(key)
+        if cached is not None and signature is not None and cached[0] == signature:
+            return self._copy_store(cached[1])
+        
+        data = single_flight.do(('read', key, signature), loader, group='read')
+        if signature is None:
+            self._cache.pop(key, None)
+        else:
+            self._cache[key] = (signature, data, estimate_size(data))
+        return self._copy_store(data)
+    
+    def _copy_store(self, data):
+        return data.model_copy(update={'symbols': list(data.symbols)})
+    
+    def loaded_bytes(self) -> int:
+        """Estimated memory held by cached stores"""
+        return sum(size for _, _, size in list(self._cache.values()))
+    
+    def clear_cache(self):
+        self._cache.clear()
+    
     def read_dex_data(self) -> DEXData:
         """Read DEX symbols from JSON file"""
+        if self.partitioned:
+            return self._read_merged('dex')
+        return self._read_store(self.dex_file, self._load_dex_data)
+    
+    def _load_dex_data(self) -> DEXData:
         try:
             with open(self.dex_file, 'r') as f:
                 data = json.load(f)
@@ -72,20 +238,29 @@ class FileManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return DEXData(symbols=[], last_updated=datetime.now().isoformat(), version=1)
     
-    def write_dex_data(self, data: DEXData):
+    def write_dex_data(self, data: DEXData, backup: bool = True):
         """Write DEX symbols to JSON file and generate txt file"""
-        self.create_backup('dex')
+        if self.partitioned:
+            self._write_partitioned('dex', data)
+            return
+        
+        if backup:
+            self.create_backup('dex')
         
         data.last_updated = datetime.now().isoformat()
         data.version += 1
         
-        with open(self.dex_file, 'w') as f:
-            json.dump(data.dict(), f, indent=2)
+        write_text_file(self.dex_file, json.dumps(data.dict(), indent=2))
         
         self.generate_dex_file(data.symbols)
     
     def read_cex_data(self) -> CEXData:
         """Read CEX symbols from JSON file"""
+        if self.partitioned:
+            return self._read_merged('cex')
+        return self._read_store(self.cex_file, self._load_cex_data)
+    
+    def _load_cex_data(self) -> CEXData:
         try:
             with open(self.cex_file, 'r') as f:
                 data = json.load(f)
@@ -98,47 +273,43 @@ class FileManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return CEXData(symbols=[], last_updated=datetime.now().isoformat(), version=1)
     
-    def write_cex_data(self, data: CEXData):
+    def write_cex_data(self, data: CEXData, backup: bool = True):
         """Write CEX symbols to JSON file and generate txt file"""
-        self.create_backup('cex')
+        if self.partitioned:
+            self._write_partitioned('cex', data)
+            return
+        
+        if backup:
+            self.create_backup('cex')
         
         data.last_updated = datetime.now().isoformat()
         data.version += 1
         
-        with open(self.cex_file, 'w') as f:
-            json.dump(data.dict(), f, indent=2)
+        write_text_file(self.cex_file, json.dumps(data.dict(), indent=2))
         
         self.generate_cex_file(data.symbols)
     
     def generate_dex_file(self, symbols: List[DEXSymbol]):
         """Generate pooladdress.txt file"""
-        content = [
-            "# Pool addresses for different DEXes",
-            "# Format: dex_type:pool_address:pool_name:altcoin_quantity", 
-            "# Supported dex_types: uniswap_v2, uniswap_v3, sushiswap_v2, sushiswap_v3",
-            "# altcoin_quantity: How many altcoins you want to exchange for WETH",
-            "",
-            "# Working pools (add your desired altcoin quantities)"
-        ]
-        
-        for symbol in symbols:
-            line = f"{symbol.dex_type}:{symbol.pool_address}:{symbol.pool_name}:{symbol.altcoin_quantity}"
-            content.append(line)
-        
-        with open(self.pooladdress_file, 'w') as f:
-            f.write('\n'.join(content))
+        content = DEX_FILE_HEADER + [self.format_txt_line('dex', symbol) for symbol in symbols]
+        
+        write_text_file(self.pooladdress_file, '\n'.join(content))
     
     def generate_cex_file(self, symbols: List[CEXSymbol]):
         """Generate cex_symbols.txt file"""
-        lines = []
-        for symbol in symbols:
+        lines = [self.format_txt_line('cex', symbol) for symbol in symbols]
+        
+        write_text_file(self.cex_symbols_file, '\n'.join(lines))
+    
+    def format_txt_line(self, kind: str, symbol) -> str:
+        """Format one symbol as a line of its generated txt file"""
+        if kind == 'dex':
+            return f"{symbol.dex_type}:{symbol.pool_address}:{symbol.pool_name}:{symbol.altcoin_quantity}"
+        if kind == 'cex':
             # Use ticker_name as fallback if symbol is None (for backward compatibility)
             symbol_value = symbol.symbol if symbol.symbol is not None else symbol.ticker_name
-            line = f"{symbol.ticker_name}:{symbol.exchange_name}:{symbol_value}"
-            lines.append(line)
-        
-        with open(self.cex_symbols_file, 'w') as f:
-            f.write('\n'.join(lines))
+            return f"{symbol.ticker_name}:{symbol.exchange_name}:{symbol_value}"
+        return f"{symbol.symbol}:{symbol.ticker}:{symbol.exchange}"
     
     def get_file_size(self, file_path: Path) -> int:
         """Get file size in bytes"""
@@ -149,6 +320,11 @@ class FileManager:
     
     def read_futures_data(self) -> FuturesData:
         """Read futures symbols from JSON file"""
+        if self.partitioned:
+            return self._read_merged('futures')
+        return self._read_store(self.futures_file, self._load_futures_data)
+    
+    def _load_futures_data(self) -> FuturesData:
         try:
             with open(self.futures_file, 'r') as f:
                 data = json.load(f)
@@ -156,30 +332,68 @@ class FileManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return FuturesData(symbols=[], last_updated=datetime.now().isoformat(), version=1)
     
-    def write_futures_data(self, data: FuturesData):
+    def write_futures_data(self, data: FuturesData, backup: bool = True):
         """Write futures symbols to JSON file and generate txt file"""
-        self.create_backup('futures')
+        if self.partitioned:
+            self._write_partitioned('futures', data)
+            return
+        
+        if backup:
+            self.create_backup('futures')
         
         data.last_updated = datetime.now().isoformat()
         data.version += 1
         
-        with open(self.futures_file, 'w') as f:
-            json.dump(data.dict(), f, indent=2)
+        write_text_file(self.futures_file, json.dumps(data.dict(), indent=2))
         
         self.generate_futures_file(data.symbols)
     
     def generate_futures_file(self, symbols: List[FuturesSymbol]):
         """Generate futures_symbols.txt file"""
-        lines = []
-        for symbol in symbols:
-            line = f"{symbol.symbol}:{symbol.ticker}:{symbol.exchange}"
-            lines.append(line)
+        lines = [self.format_txt_line('futures', symbol) for symbol in symbols]
         
-        with open(self.futures_symbols_file, 'w') as f:
-            f.write('\n'.join(lines))
+        write_text_file(self.futures_symbols_file, '\n'.join(lines))
+    
+    def regenerate_dex_file(self):
+        """Regenerate pooladdress.txt, joining a regeneration already in progress"""
+        single_flight.do(
+            ('generate', str(self.pooladdress_file.resolve())),
+            lambda: self.generate_dex_file(self.read_dex_data().symbols),
+            group='generate'
+        )
+    
+    def regenerate_cex_file(self):
+        """Regenerate cex_symbols.txt, joining a regeneration already in progress"""
+        single_flight.do(
+            ('generate', str(self.cex_symbols_file.resolve())),
+            lambda: self.generate_cex_file(self.read_cex_data().symbols),
+            group='generate'
+        )
+    
+    def regenerate_futures_file(self):
+        """Regenerate futures_symbols.txt, joining a regeneration already in progress"""
+        single_flight.do(
+            ('generate', str(self.futures_symbols_file.resolve())),
+            lambda: self.generate_futures_file(self.read_futures_data().symbols),
+            group='generate'
+        )
+    
+    def get_coalescing_stats(self) -> dict:
+        """Report how much read, regeneration and backup work was deduplicated"""
+        return {
+            'in_flight': single_flight.in_flight(),
+            'groups': single_flight.get_stats()
+        }
     
     def sync_txt_files(self):
         """Generate txt files from current JSON data"""
+        if self.partitioned:
+            for kind in SHARD_FIELDS:
+                for shard in self._shard_names(kind):
+                    self._generate_shard_file(kind, shard, self._read_shard(kind, shard).symbols)
+                self._generate_merged_file(kind)
+            return
+        
         dex_data = self.read_dex_data()
         cex_data = self.read_cex_data()
         futures_data = self.read_futures_data()
@@ -189,101 +403,547 @@ class FileManager:
     
     def add_dex_symbol(self, symbol_data: dict) -> DEXSymbol:
         """Add a new DEX symbol"""
-        data = self.read_dex_data()
+        if self.partitioned:
+            return self._add_partitioned('dex', symbol_data)
         
-        # Check for duplicates
-        for existing in data.symbols:
-            if existing.pool_address.lower() == symbol_data['pool_address'].lower():
-                raise ValueError(f"Pool address {symbol_data['pool_address']} already exists")
-        
-        new_symbol = DEXSymbol(
-            id=str(uuid.uuid4()),
-            created_at=datetime.now().isoformat(),
-            updated_at=datetime.now().isoformat(),
-            **symbol_data
-        )
-        
-        data.symbols.append(new_symbol)
-        self.write_dex_data(data)
-        return new_symbol
+        with _lock_for(self.dex_file):
+            data = self.read_dex_data()
+            
+            # Check for duplicates
+            for existing in data.symbols:
+                if existing.pool_address.lower() == symbol_data['pool_address'].lower():
+                    raise ValueError(f"Pool address {symbol_data['pool_address']} already exists")
+            
+            new_symbol = DEXSymbol(
+                id=str(uuid.uuid4()),
+                created_at=datetime.now().isoformat(),
+                updated_at=datetime.now().isoformat(),
+                **symbol_data
+            )
+            
+            data.symbols.append(new_symbol)
+            self.write_dex_data(data)
+            return new_symbol
     
     def update_dex_symbol(self, symbol_id: str, symbol_data: dict) -> DEXSymbol:
         """Update an existing DEX symbol"""
-        data = self.read_dex_data()
-        
-        for i, symbol in enumerate(data.symbols):
-            if symbol.id == symbol_id:
-                updated_symbol = DEXSymbol(
-                    id=symbol_id,
-                    created_at=symbol.created_at,
-                    updated_at=datetime.now().isoformat(),
-                    **symbol_data
-                )
-                data.symbols[i] = updated_symbol
-                self.write_dex_data(data)
-                return updated_symbol
+        if self.partitioned:
+            return self._update_partitioned('dex', symbol_id, symbol_data)
         
-        raise ValueError(f"DEX symbol with id {symbol_id} not found")
+        with _lock_for(self.dex_file):
+            data = self.read_dex_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    updated_symbol = DEXSymbol(
+                        id=symbol_id,
+                        created_at=symbol.created_at,
+                        updated_at=datetime.now().isoformat(),
+                        **symbol_data
+                    )
+                    data.symbols[i] = updated_symbol
+                    self.write_dex_data(data)
+                    return updated_symbol
+            
+            raise ValueError(f"DEX symbol with id {symbol_id} not found")
     
     def delete_dex_symbol(self, symbol_id: str):
         """Delete a DEX symbol"""
-        data = self.read_dex_data()
+        if self.partitioned:
+            self._delete_partitioned('dex', symbol_id)
+            return
         
-        for i, symbol in enumerate(data.symbols):
-            if symbol.id == symbol_id:
-                data.symbols.pop(i)
-                self.write_dex_data(data)
-                return
-        
-        raise ValueError(f"DEX symbol with id {symbol_id} not found")
+        with _lock_for(self.dex_file):
+            data = self.read_dex_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    data.symbols.pop(i)
+                    self.write_dex_data(data)
+                    return
+            
+            raise ValueError(f"DEX symbol with id {symbol_id} not found")
     
     def add_cex_symbol(self, symbol_data: dict) -> CEXSymbol:
         """Add a new CEX symbol"""
-        data = self.read_cex_data()
+        if self.partitioned:
+            return self._add_partitioned('cex', symbol_data)
         
-        # Check for duplicates
-        for existing in data.symbols:
-            if (existing.ticker_name == symbol_data['ticker_name'].upper() and 
-                existing.exchange_name.lower() == symbol_data['exchange_name'].lower()):
-                raise ValueError(f"Symbol {symbol_data['ticker_name']} on {symbol_data['exchange_name']} already exists")
+        with _lock_for(self.cex_file):
+            data = self.read_cex_data()
+            
+            # Check for duplicates
+            for existing in data.symbols:
+                if (existing.ticker_name == symbol_data['ticker_name'].upper() and 
+                    existing.exchange_name.lower() == symbol_data['exchange_name'].lower()):
+                    raise ValueError(f"Symbol {symbol_data['ticker_name']} on {symbol_data['exchange_name']} already exists")
+            
+            new_symbol = CEXSymbol(
+                id=str(uuid.uuid4()),
+                created_at=datetime.now().isoformat(),
+                updated_at=datetime.now().isoformat(),
+                **symbol_data
+            )
+            
+            data.symbols.append(new_symbol)
+            self.write_cex_data(data)
+            return new_symbol
+    
+    def update_cex_symbol(self, symbol_id: str, symbol_data: dict) -> CEXSymbol:
+        """Update an existing CEX symbol"""
+        if self.partitioned:
+            return self._update_partitioned('cex', symbol_id, symbol_data)
         
-        new_symbol = CEXSymbol(
+        with _lock_for(self.cex_file):
+            data = self.read_cex_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    updated_symbol = CEXSymbol(
+                        id=symbol_id,
+                        created_at=symbol.created_at,
+                        updated_at=datetime.now().isoformat(),
+                        **symbol_data
+                    )
+                    data.symbols[i] = updated_symbol
+                    self.write_cex_data(data)
+                    return updated_symbol
+            
+            raise ValueError(f"CEX symbol with id {symbol_id} not found")
+    
+    def delete_cex_symbol(self, symbol_id: str):
+        """Delete a CEX symbol"""
+        if self.partitioned:
+            self._delete_partitioned('cex', symbol_id)
+            return
+        
+        with _lock_for(self.cex_file):
+            data = self.read_cex_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    data.symbols.pop(i)
+                    self.write_cex_data(data)
+                    return
+            
+            raise ValueError(f"CEX symbol with id {symbol_id} not found")
+    
+    def add_futures_symbol(self, symbol_data: dict) -> FuturesSymbol:
+        """Add a new futures symbol"""
+        if self.partitioned:
+            return self._add_partitioned('futures', symbol_data)
+        
+        with _lock_for(self.futures_file):
+            data = self.read_futures_data()
+            
+            new_symbol = FuturesSymbol(
+                id=str(uuid.uuid4()),
+                created_at=datetime.now().isoformat(),
+                updated_at=datetime.now().isoformat(),
+                **symbol_data
+            )
+            
+            data.symbols.append(new_symbol)
+            self.write_futures_data(data)
+            return new_symbol
+    
+    def update_futures_symbol(self, symbol_id: str, symbol_data: dict) -> FuturesSymbol:
+        """Update an existing futures symbol"""
+        if self.partitioned:
+            return self._update_partitioned('futures', symbol_id, symbol_data)
+        
+        with _lock_for(self.futures_file):
+            data = self.read_futures_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    updated_symbol = FuturesSymbol(
+                        id=symbol_id,
+                        created_at=symbol.created_at,
+                        updated_at=datetime.now().isoformat(),
+                        **symbol_data
+                    )
+                    data.symbols[i] = updated_symbol
+                    self.write_futures_data(data)
+                    return updated_symbol
+            
+            raise ValueError(f"Futures symbol with id {symbol_id} not found")
+    
+    def delete_futures_symbol(self, symbol_id: str):
+        """Delete a futures symbol"""
+        if self.partitioned:
+            self._delete_partitioned('futures', symbol_id)
+            return
+        
+        with _lock_for(self.futures_file):
+            data = self.read_futures_data()
+            
+            for i, symbol in enumerate(data.symbols):
+                if symbol.id == symbol_id:
+                    data.symbols.pop(i)
+                    self.write_futures_data(data)
+                    return
+            
+            raise ValueError(f"Futures symbol with id {symbol_id} not found")
+    
+    # Partitioned layout
+    
+    def _shard_name(self, value: str) -> str:
+        """Map an exchange / dex_type to a safe shard file name"""
+        return re.sub(r'[^a-z0-9_-]+', '_', value.strip().lower()) or '_'
+    
+    def _shard_for(self, kind: str, symbol) -> str:
+        return self._shard_name(getattr(symbol, SHARD_FIELDS[kind]))
+    
+    def _shard_path(self, kind: str, shard: str) -> Path:
+        return self.shards_dir / kind / f"{shard}.json"
+    
+    def _shard_names(self, kind: str) -> List[str]:
+        return sorted(path.stem for path in (self.shards_dir / kind).glob("*.json"))
+    
+    def _shard_lock(self, kind: str, shards) -> ExitStack:
+        """Hold the write locks of the given shards, always taken in name order"""
+        stack = ExitStack()
+        for shard in sorted(set(shards)):
+            stack.enter_context(_lock_for(self._shard_path(kind, shard)))
+        return stack
+    
+    def _read_shard(self, kind: str, shard: str):
+        """Read one shard of a store"""
+        path = self._shard_path(kind, shard)
+        return self._read_store(path, lambda: self._load_shard(kind, path))
+    
+    def _load_shard(self, kind: str, path: Path):
+        try:
+            return self.parse_store_file(kind, path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return DATA_MODELS[kind](symbols=[], last_updated=datetime.now().isoformat(), version=1)
+    
+    def _read_merged(self, kind: str):
+        """Merged view over every shard of a store.
+
+        The merged version is the sum of the shard versions plus the store's
+        version offset, so it still increases whenever any shard is written.
+        """
+        shards = [self._read_shard(kind, shard) for shard in self._shard_names(kind)]
+        return DATA_MODELS[kind](
+            symbols=[symbol for data in shards for symbol in data.symbols],
+            last_updated=max((data.last_updated for data in shards), default=datetime.now().isoformat()),
+            version=max(1, self._version_offset(kind) + sum(data.version for data in shards))
+        )
+    
+    def _version_offset(self, kind: str) -> int:
+        try:
+            with open(self.version_offsets_file, 'r') as f:
+                return json.load(f).get(kind, 0)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+    
+    def _add_version_offset(self, kind: str, delta: int):
+        with _lock_for(self.version_offsets_file):
+            try:
+                with open(self.version_offsets_file, 'r') as f:
+                    offsets = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                offsets = {}
+            offsets[kind] = offsets.get(kind, 0) + delta
+            write_text_file(self.version_offsets_file, json.dumps(offsets, indent=2))
+    
+    def _write_shard(self, kind: str, shard: str, data, backup: bool = True, regenerate_merged: bool = True):
+        """Write one shard; the caller must hold its lock"""
+        path = self._shard_path(kind, shard)
+        if backup:
+            self._backup_file(path, self.shard_backups_dir / kind)
+        
+        data.last_updated = datetime.now().isoformat()
+        data.version += 1
+        
+        write_text_file(path, json.dumps(data.dict(), indent=2))
+        
+        self._generate_shard_file(kind, shard, data.symbols)
+        if regenerate_merged:
+            self._generate_merged_file(kind)
+    
+    def _write_partitioned(self, kind: str, data):
+        """Split a full store across its shards, rewriting only the shards that changed"""
+        groups: Dict[str, list] = {}
+        for symbol in data.symbols:
+            groups.setdefault(self._shard_for(kind, symbol), []).append(symbol)
+        
+        for shard in sorted(set(groups) | set(self._shard_names(kind))):
+            with self._shard_lock(kind, [shard]):
+                current = self._read_shard(kind, shard)
+                symbols = groups.get(shard, [])
+                if [s.dict() for s in current.symbols] != [s.dict() for s in symbols]:
+                    current.symbols = symbols
+                    self._write_shard(kind, shard, current)
+        
+        merged = self._read_merged(kind)
+        data.last_updated = merged.last_updated
+        data.version = merged.version
+    
+    def _generate_shard_file(self, kind: str, shard: str, symbols: list):
+        """Generate the txt file for a single shard"""
+        lines = [self.format_txt_line(kind, symbol) for symbol in symbols]
+        write_text_file(self.generated_dir / kind / f"{shard}.txt", '\n'.join(lines))
+    
+    def _generate_merged_file(self, kind: str):
+        """Rebuild the combined txt file by concatenating the shard txt files"""
+        target = self.txt_files[kind]
+        
+        # Read under the lock so the last shard writer always rebuilds from complete shard files
+        with _lock_for(target):
+            lines = []
+            for path in sorted((self.generated_dir / kind).glob("*.txt")):
+                content = path.read_text()
+                if content:
+                    lines.extend(content.split('\n'))
+            
+            if kind == 'dex':
+                lines = DEX_FILE_HEADER + lines
+            
+            write_text_file(target, '\n'.join(lines))
+    
+    def _check_duplicate(self, kind: str, symbols: list, new_symbol):
+        if kind == 'dex':
+            for existing in symbols:
+                if existing.pool_address.lower() == new_symbol.pool_address.lower():
+                    raise ValueError(f"Pool address {new_symbol.pool_address} already exists")
+        elif kind == 'cex':
+            for existing in symbols:
+                if (existing.ticker_name == new_symbol.ticker_name and 
+                    existing.exchange_name.lower() == new_symbol.exchange_name.lower()):
+                    raise ValueError(f"Symbol {new_symbol.ticker_name} on {new_symbol.exchange_name} already exists")
+    
+    def _find_shard(self, kind: str, symbol_id: str) -> Optional[str]:
+        for shard in self._shard_names(kind):
+            if any(symbol.id == symbol_id for symbol in self._read_shard(kind, shard).symbols):
+                return shard
+        return None
+    
+    def _reserve_pool_address(self, new_symbol):
+        """Check a pool address against every DEX shard and reserve it until released.
+
+        Only this check holds the store-wide lock, so adds to different
+        dex_types write their shards in parallel.
+        """
+        store_dir = self.shards_dir / 'dex'
+        address = new_symbol.pool_address.lower()
+        with _lock_for(store_dir):
+            pending = _pending_addresses.setdefault(str(store_dir.resolve()), set())
+            if address in pending:
+                raise ValueError(f"Pool address {new_symbol.pool_address} already exists")
+            symbols = [symbol for shard in self._shard_names('dex') for symbol in self._read_shard('dex', shard).symbols]
+            self._check_duplicate('dex', symbols, new_symbol)
+            pending.add(address)
+        return address
+    
+    def _release_pool_address(self, address: str):
+        store_dir = self.shards_dir / 'dex'
+        with _lock_for(store_dir):
+            _pending_addresses[str(store_dir.resolve())].discard(address)
+    
+    def _add_partitioned(self, kind: str, symbol_data: dict):
+        new_symbol = SYMBOL_MODELS[kind](
             id=str(uuid.uuid4()),
             created_at=datetime.now().isoformat(),
             updated_at=datetime.now().isoformat(),
             **symbol_data
         )
+        shard = self._shard_for(kind, new_symbol)
         
-        data.symbols.append(new_symbol)
-        self.write_cex_data(data)
+        # Pool addresses are unique across every DEX type; CEX tickers only per exchange
+        address = self._reserve_pool_address(new_symbol) if kind == 'dex' else None
+        try:
+            with self._shard_lock(kind, [shard]):
+                data = self._read_shard(kind, shard)
+                self._check_duplicate(kind, data.symbols, new_symbol)
+                data.symbols.append(new_symbol)
+                self._write_shard(kind, shard, data)
+        finally:
+            if address is not None:
+                self._release_pool_address(address)
         return new_symbol
     
-    def update_cex_symbol(self, symbol_id: str, symbol_data: dict) -> CEXSymbol:
-        """Update an existing CEX symbol"""
-        data = self.read_cex_data()
+    def _update_partitioned(self, kind: str, symbol_id: str, symbol_data: dict):
+        target = self._shard_name(symbol_data[SHARD_FIELDS[kind]])
         
-        for i, symbol in enumerate(data.symbols):
-            if symbol.id == symbol_id:
-                updated_symbol = CEXSymbol(
+        while True:
+            source = self._find_shard(kind, symbol_id)
+            if source is None:
+                raise ValueError(f"{STORE_LABELS[kind]} symbol with id {symbol_id} not found")
+            
+            # A changed exchange / dex_type moves the symbol to another shard
+            with ExitStack() as stack:
+                if kind == 'dex' and target != source:
+                    # Keep adds from claiming the pool address while it is between shards
+                    stack.enter_context(_lock_for(self.shards_dir / kind))
+                stack.enter_context(self._shard_lock(kind, [source, target]))
+                
+                # Look the symbol up again now that its shard is locked: a
+                # concurrent update may have moved it away in the meantime
+                data = self._read_shard(kind, source)
+                index = next((i for i, symbol in enumerate(data.symbols) if symbol.id == symbol_id), None)
+                if index is None:
+                    continue
+                
+                updated_symbol = SYMBOL_MODELS[kind](
                     id=symbol_id,
-                    created_at=symbol.created_at,
+                    created_at=data.symbols[index].created_at,
                     updated_at=datetime.now().isoformat(),
                     **symbol_data
                 )
-                data.symbols[i] = updated_symbol
-                self.write_cex_data(data)
+                if target == source:
+                    data.symbols[index] = updated_symbol
+                    self._write_shard(kind, source, data)
+                    return updated_symbol
+                
+                # Drop it from the source before adding it to the target so it is
+                # never listed twice, and rebuild the merged txt file once at the end
+                data.symbols.pop(index)
+                self._write_shard(kind, source, data, regenerate_merged=False)
+                target_data = self._read_shard(kind, target)
+                target_data.symbols.append(updated_symbol)
+                self._write_shard(kind, target, target_data, regenerate_merged=False)
+                self._generate_merged_file(kind)
                 return updated_symbol
-        
-        raise ValueError(f"CEX symbol with id {symbol_id} not found")
     
-    def delete_cex_symbol(self, symbol_id: str):
-        """Delete a CEX symbol"""
-        data = self.read_cex_data()
+    def _delete_partitioned(self, kind: str, symbol_id: str):
+        while True:
+            shard = self._find_shard(kind, symbol_id)
+            if shard is None:
+                raise ValueError(f"{STORE_LABELS[kind]} symbol with id {symbol_id} not found")
+            
+            with self._shard_lock(kind, [shard]):
+                data = self._read_shard(kind, shard)
+                for i, symbol in enumerate(data.symbols):
+                    if symbol.id == symbol_id:
+                        data.symbols.pop(i)
+                        self._write_shard(kind, shard, data)
+                        return
+            # Moved to another shard meanwhile; find it again
+    
+    def migrate_to_partitioned(self) -> Dict[str, Dict[str, int]]:
+        """Split the single-file stores into per-exchange / per-dex_type shards.
+
+        The original JSON files are backed up and left in place but are no
+        longer read once the shards directory exists. Use
+        migrate_to_single_file() to go back: deleting shards/ instead would
+        bring back the stale single files and lose every write made since.
+        """
+        if self.partitioned or self.shards_dir.is_dir():
+            raise ValueError("Data directory is already partitioned")
+        
+        stores = {
+            'dex': self._load_dex_data(),
+            'cex': self._load_cex_data(),
+            'futures': self._load_futures_data()
+        }
+        for kind in stores:
+            self.create_backup(kind)
         
-        for i, symbol in enumerate(data.symbols):
-            if symbol.id == symbol_id:
-                data.symbols.pop(i)
-                self.write_cex_data(data)
-                return
+        self.partitioned = True
+        self.initialize_directories()
         
-        raise ValueError(f"CEX symbol with id {symbol_id} not found")
\ No newline at end of file
+        summary = {}
+        for kind, data in stores.items():
+            groups: Dict[str, list] = {}
+            for symbol in data.symbols:
+                groups.setdefault(self._shard_for(kind, symbol), []).append(symbol)
+            
+            for shard, symbols in groups.items():
+                shard_data = DATA_MODELS[kind](symbols=symbols, last_updated=data.last_updated, version=1)
+                write_text_file(self._shard_path(kind, shard), json.dumps(shard_data.dict(), indent=2))
+            # Carry the store version over so the merged version does not go backwards
+            self._add_version_offset(kind, data.version - len(groups))
+            summary[kind] = {shard: len(symbols) for shard, symbols in groups.items()}
+        
+        self.sync_txt_files()
+        return summary
+    
+    def migrate_to_single_file(self) -> Dict[str, int]:
+        """Merge the shards back into the single-file stores.
+
+        The merged stores, with their current versions, replace the single
+        JSON files left behind by migrate_to_partitioned(), which are backed
+        up first. shards/ is then moved into backups/ and the per-shard txt
+        output removed, so the single-file layout is used from then on.
+        """
+        if not self.partitioned:
+            raise ValueError("Data directory is not partitioned")
+        
+        stores = {kind: self._read_merged(kind) for kind in SHARD_FIELDS}
+        files = {'dex': self.dex_file, 'cex': self.cex_file, 'futures': self.futures_file}
+        for kind, data in stores.items():
+            self._backup_file(files[kind], self.backups_dir)
+            write_text_file(files[kind], json.dumps(data.dict(), indent=2))
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        shutil.move(str(self.shards_dir), str(self.backups_dir / f"shards_{timestamp}"))
+        for kind in SHARD_FIELDS:
+            shutil.rmtree(self.generated_dir / kind, ignore_errors=True)
+        
+        self.partitioned = False
+        self.clear_cache()
+        self.sync_txt_files()
+        return {kind: len(data.symbols) for kind, data in stores.items()}
+    
+    # Hooks for the filesystem watcher
+    
+    def parse_store_file(self, kind: str, path: Path):
+        """Load a store or shard file, raising instead of falling back to an empty store"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if kind == 'cex':
+            for symbol_data in data.get('symbols', []):
+                if 'symbol' not in symbol_data:
+                    symbol_data['symbol'] = symbol_data.get('ticker_name', '')
+        return DATA_MODELS[kind](**data)
+    
+    def store_files(self) -> Dict[Path, tuple]:
+        """Map every JSON store file on disk to its (kind, shard)"""
+        if not self.partitioned:
+            return {
+                self.dex_file: ('dex', None),
+                self.cex_file: ('cex', None),
+                self.futures_file: ('futures', None)
+            }
+        return {
+            self._shard_path(kind, shard): (kind, shard)
+            for kind in SHARD_FIELDS
+            for shard in self._shard_names(kind)
+        }
+    
+    def store_lock(self, kind: str, shard: Optional[str] = None) -> ExitStack:
+        """Lock a whole store, or a single shard of a partitioned store"""
+        if not self.partitioned:
+            stack = ExitStack()
+            stack.enter_context(_lock_for({'dex': self.dex_file, 'cex': self.cex_file, 'futures': self.futures_file}[kind]))
+            return stack
+        return self._shard_lock(kind, [shard] if shard else self._shard_names(kind))
+    
+    def write_store(self, kind: str, data, shard: Optional[str] = None, previous=None):
+        """Write a whole store, or a single shard; the caller must hold store_lock.
+
+        When the file on disk was already overwritten by an external edit,
+        pass the last good contents as previous: they are backed up instead
+        of the edited file.
+        """
+        if previous is not None:
+            if self.partitioned and shard:
+                path, backups_dir = self._shard_path(kind, shard), self.shard_backups_dir / kind
+            else:
+                path, backups_dir = {'dex': self.dex_file, 'cex': self.cex_file, 'futures': self.futures_file}[kind], self.backups_dir
+            self._backup_file(path, backups_dir, json.dumps(previous.dict(), indent=2))
+        
+        if self.partitioned and shard:
+            self._write_shard(kind, shard, data, backup=previous is None)
+        else:
+            getattr(self, f'write_{kind}_data')(data, backup=previous is None)
+    
+    def drop_shard(self, kind: str, shard: str, last_version: int = 0):
+        """Forget the generated output of a shard whose JSON file was removed"""
+        # Keep the removed shard's versions in the merged version
+        self._add_version_offset(kind, last_version + 1)
+        (self.generated_dir / kind / f"{shard}.txt").unlink(missing_ok=True)
+        self._generate_merged_file(kind)
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Migrate a data directory between single-file stores and per-shard stores.
+
+Run from the backend directory while the API is stopped:
+
+    python -m app.utils.migrate_partitions [data_dir]
+    python -m app.utils.migrate_partitions --to-single-file [data_dir]
+"""
+import argparse
+import sys
+
+from app.utils.file_manager import FileManager
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('data_dir', nargs='?', default="data")
+    parser.add_argument('--to-single-file', action='store_true', help="merge the shards back into single-file stores")
+    args = parser.parse_args()
+
+    if args.to_single_file:
+        file_manager = FileManager(data_dir=args.data_dir, sync_txt=False)
+        try:
+            counts = file_manager.migrate_to_single_file()
+        except ValueError as e:
+            print(f"Migration skipped: {e}")
+            sys.exit(1)
+        for kind, count in counts.items():
+            print(f"{kind}: {count}")
+        return
+
+    file_manager = FileManager(data_dir=args.data_dir, partitioned=False)
+
+    try:
+        summary = file_manager.migrate_to_partitioned()
+    except ValueError as e:
+        print(f"Migration skipped: {e}")
+        sys.exit(1)
+
+    for kind, shards in summary.items():
+        counts = ", ".join(f"{shard}={count}" for shard, count in sorted(shards.items())) or "empty"
+        print(f"{kind}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.utils.file_manager import FileManager
+from app.utils.watcher import SharedWatcher
+
+NAMESPACE_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class NamespaceRegistry:
+    """Isolated data namespaces, each with its own FileManager under root/<name>/.
+
+    Namespaces are created explicitly with create(); get() only opens
+    namespaces that already exist. A namespace's FileManager is created on
+    first access, so startup does not touch any namespace directory, and
+    opening an existing namespace does not rewrite its txt files.
+
+    Loaded namespaces are kept in LRU order and the least recently used ones
+    are evicted once the stores they hold in memory (cached reads and watcher
+    snapshots) exceed memory_budget bytes, or once more than max_loaded
+    namespaces are open. Evicting only drops the in-memory FileManager and
+    watcher; its files stay on disk and are reloaded on the next access.
+
+    When watcher_factory is given, each loaded namespace gets its own
+    watcher, snapshotted on load and dropped on eviction. All of them are
+    driven by one SharedWatcher on root, so the number of namespaces does
+    not add threads or inotify instances.
+    """
+
+    def __init__(
+        self,
+        root: str = "namespaces",
+        memory_budget: int = 64 * 1024 * 1024,
+        max_loaded: Optional[int] = None,
+        watcher_factory: Optional[Callable] = None
+    ):
+        self.root = Path(root)
+        self.memory_budget = memory_budget
+        self.max_loaded = max_loaded
+        self.watcher_factory = watcher_factory
+        self._loaded: "OrderedDict[str, FileManager]" = OrderedDict()
+        self._watchers: Dict[str, object] = {}
+        self.shared_watcher = SharedWatcher(root) if watcher_factory else None
+        self._lock = threading.Lock()
+        self.stats = {'loads': 0, 'hits': 0, 'evictions': 0}
+
+    def _validate(self, name: str):
+        if not NAMESPACE_PATTERN.match(name):
+            raise ValueError(f"Invalid namespace name {name}")
+
+    def exists(self, name: str) -> bool:
+        return (self.root / name).is_dir()
+
+    def create(self, name: str) -> FileManager:
+        """Create a new namespace with empty stores and load it"""
+        self._validate(name)
+        namespace_dir = self.root / name
+        try:
+            namespace_dir.mkdir(parents=True)
+        except FileExistsError:
+            raise FileExistsError(f"Namespace {name} already exists")
+
+        FileManager(data_dir=str(namespace_dir / "data"), output_dir=str(namespace_dir))
+        return self.get(name)
+
+    def get(self, name: str) -> FileManager:
+        """Return the FileManager of an existing namespace, loading it if needed"""
+        self._validate(name)
+
+        with self._lock:
+            file_manager = self._loaded.get(name)
+            if file_manager is not None:
+                self._loaded.move_to_end(name)
+                self.stats['hits'] += 1
+                self._evict()
+        if file_manager is not None:
+            return file_manager
+
+        if not self.exists(name):
+            raise KeyError(f"Namespace {name} not found")
+
+        # Created outside the registry lock: opening a namespace touches its
+        # files and must not block requests for other namespaces.
+        namespace_dir = self.root / name
+        file_manager = FileManager(data_dir=str(namespace_dir / "data"), output_dir=str(namespace_dir), sync_txt=False)
+        watcher = self.watcher_factory(file_manager) if self.watcher_factory else None
+        if watcher is not None:
+            watcher.snapshot()
+
+        with self._lock:
+            # Another request may have loaded it meanwhile; keep the first one
+            loaded = self._loaded.setdefault(name, file_manager)
+            if loaded is file_manager:
+                if watcher is not None:
+                    self._watchers[name] = watcher
+                    self.shared_watcher.add(name, watcher)
+                self.stats['loads'] += 1
+            self._loaded.move_to_end(name)
+            self._evict()
+        return loaded
+
+    def watcher(self, name: str):
+        """Watcher of a loaded namespace, or None"""
+        return self._watchers.get(name)
+
+    def _evict(self):
+        """Drop least recently used namespaces until within budget; caller holds the lock"""
+        while len(self._loaded) > 1 and (
+            self.loaded_bytes() > self.memory_budget
+            or (self.max_loaded is not None and len(self._loaded) > self.max_loaded)
+        ):
+            name, file_manager = self._loaded.popitem(last=False)
+            file_manager.clear_cache()
+            if self._watchers.pop(name, None) is not None:
+                self.shared_watcher.remove(name)
+            self.stats['evictions'] += 1
+
+    def close(self):
+        """Stop watching every loaded namespace"""
+        if self.shared_watcher is not None:
+            self.shared_watcher.stop()
+
+    def loaded_bytes(self) -> int:
+        """Estimated memory held by loaded namespaces: cached stores plus watcher snapshots"""
+        watchers = dict(self._watchers)
+        return sum(
+            file_manager.loaded_bytes() + (watchers[name].loaded_bytes() if name in watchers else 0)
+            for name, file_manager in list(self._loaded.items())
+        )
+
+    def names(self) -> List[str]:
+        """Every namespace on disk, loaded or not"""
+        if not self.root.is_dir():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir() and NAMESPACE_PATTERN.match(path.name))
+
+    def status(self) -> Dict:
+        with self._lock:
+            loaded = list(self._loaded)
+            loaded_bytes = self.loaded_bytes()
+        return {
+            'namespaces': self.names(),
+            'loaded': loaded,
+            'loaded_bytes': loaded_bytes,
+            'memory_budget': self.memory_budget,
+            'max_loaded': self.max_loaded,
+            **self.stats
+        }
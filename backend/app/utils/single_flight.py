@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """An in-flight execution that concurrent callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running block until it finishes and receive the same result
+    (or exception). Once the call completes the key is forgotten, so the
+    next caller starts a fresh execution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], group: str = "default") -> Any:
+        """Run fn under key, or join the execution already running for it"""
+        with self._lock:
+            stats = self._stats.setdefault(group, {"executions": 0, "coalesced": 0})
+            call = self._calls.get(key)
+            if call is not None:
+                stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of executions currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-group counts of executions and coalesced (deduplicated) calls"""
+        with self._lock:
+            return {
+                group: {
+                    **counts,
+                    "requests": counts["executions"] + counts["coalesced"],
+                }
+                for group, counts in self._stats.items()
+            }
+
+
+# Shared by every FileManager in the process so that the routers, which each
+# hold their own FileManager, coalesce against one another.
+single_flight = SingleFlight()
@@ -0,0 +1,474 @@
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.utils.file_manager import FileManager, SHARD_FIELDS, SYMBOL_MODELS, estimate_size, file_signature, is_own_write
+
+# watchfiles ships with uvicorn[standard] and uses inotify on Linux
+try:
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+# Field order of each generated txt line
+TXT_FIELDS = {
+    'dex': ['dex_type', 'pool_address', 'pool_name', 'altcoin_quantity'],
+    'cex': ['ticker_name', 'exchange_name', 'symbol'],
+    'futures': ['symbol', 'ticker', 'exchange']
+}
+
+
+def _txt_key(kind: str, record: dict) -> tuple:
+    """Natural key used to match a txt line to an existing symbol"""
+    if kind == 'dex':
+        return (record['pool_address'].lower(),)
+    if kind == 'cex':
+        return (record['ticker_name'].upper(), record['exchange_name'].lower())
+    return (record['symbol'].upper(), record['ticker'].upper(), record['exchange'].lower())
+
+
+def _parse_txt(kind: str, content: str) -> List[dict]:
+    """Parse a generated txt file back into symbol fields, skipping comments"""
+    fields = TXT_FIELDS[kind]
+    records = []
+    seen = set()
+    for number, line in enumerate(content.split('\n'), 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        parts = line.split(':')
+        if len(parts) != len(fields):
+            raise ValueError(f"line {number}: expected {len(fields)} fields, got {len(parts)}")
+        record = dict(zip(fields, parts))
+        if kind == 'dex':
+            record['altcoin_quantity'] = int(record['altcoin_quantity'])
+
+        key = _txt_key(kind, record)
+        if key in seen:
+            raise ValueError(f"line {number}: duplicate entry {line}")
+        seen.add(key)
+        records.append(record)
+    return records
+
+
+def _diff(before: Dict[str, dict], after: Dict[str, dict]) -> Dict[str, List[str]]:
+    """Symbol ids added, updated and removed between two {id: record} maps"""
+    return {
+        'added': [symbol_id for symbol_id in after if symbol_id not in before],
+        'updated': [symbol_id for symbol_id in after if symbol_id in before and before[symbol_id] != after[symbol_id]],
+        'removed': [symbol_id for symbol_id in before if symbol_id not in after]
+    }
+
+
+class StoreWatcher:
+    """Pick up changes made to the stores and generated txt files outside the API.
+
+    Each JSON store (or shard) is diffed against the last snapshot the
+    watcher saw. External edits are written back through the FileManager,
+    which bumps the version, backs up and regenerates the txt output;
+    writes made by this process are only diffed. Subscribers receive one
+    event per change with the ids that were added, updated and removed.
+
+    Hand edits to the generated txt files are ingested back into the stores
+    when ingest_txt is set; otherwise they are left for the next write to
+    overwrite, as before. A txt file is only ingested once it has stopped
+    changing for settle_delay seconds, never when it holds no entries, and
+    not when it would remove more than max_removed_fraction of the store
+    unless allow_mass_removal is set. This keeps a file caught between
+    truncate and write from wiping the store.
+
+    start() runs the watcher in its own thread. Watchers of many directories
+    can instead share one thread through a SharedWatcher.
+    """
+
+    def __init__(
+        self,
+        file_manager: FileManager,
+        ingest_txt: bool = False,
+        poll_interval: float = 1.0,
+        settle_delay: float = 0.5,
+        max_removed_fraction: float = 0.5,
+        allow_mass_removal: bool = False
+    ):
+        self.file_manager = file_manager
+        self.ingest_txt = ingest_txt
+        self.poll_interval = poll_interval
+        self.settle_delay = settle_delay
+        self.max_removed_fraction = max_removed_fraction
+        self.allow_mass_removal = allow_mass_removal
+        self.mode: Optional[str] = None
+        # Set while a SharedWatcher drives this watcher instead of its own thread
+        self.shared: Optional["SharedWatcher"] = None
+        self.stats = {'external_edits': 0, 'own_writes': 0, 'txt_ingests': 0, 'txt_refused': 0, 'errors': 0}
+
+        self._subscribers: List[Callable[[dict], None]] = []
+        self._signatures: Dict[Path, tuple] = {}
+        self._locations: Dict[Path, tuple] = {}
+        # Last valid parsed contents of each store file: diffed against on every change,
+        # and backed up before an external edit is written back
+        self._last_good: Dict[Path, object] = {}
+        self._sizes: Dict[Path, int] = {}
+        self._data_dir = file_manager.data_dir.resolve()
+        self._shards_dir = file_manager.shards_dir.resolve()
+        self._txt_paths = {path.resolve() for path in file_manager.txt_files.values()}
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """Call callback with every change event"""
+        self._subscribers.append(callback)
+
+    def start(self):
+        """Snapshot the current files and start watching in a background thread"""
+        if self._thread is not None:
+            return
+
+        self.snapshot()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="store-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def snapshot(self):
+        """Record the current files as the baseline that later changes are diffed against"""
+        with self._check_lock:
+            for path, location in self.file_manager.store_files().items():
+                self._signatures[path] = file_signature(path)
+                self._take_snapshot(path, location)
+            for path in self.file_manager.txt_files.values():
+                self._signatures[path] = file_signature(path)
+
+    def loaded_bytes(self) -> int:
+        """Estimated memory held by the snapshots"""
+        return sum(list(self._sizes.values()))
+
+    def status(self) -> dict:
+        shared = self.shared
+        return {
+            'running': self._thread is not None or (shared is not None and shared.running),
+            'mode': shared.mode if shared is not None else self.mode,
+            'ingest_txt': self.ingest_txt,
+            **self.stats
+        }
+
+    def _run(self):
+        if watchfiles is not None:
+            try:
+                self.mode = 'inotify'
+                for _ in watchfiles.watch(
+                    *self._watch_roots(),
+                    watch_filter=self._is_relevant,
+                    recursive=False,
+                    stop_event=self._stop,
+                    raise_interrupt=False
+                ):
+                    self.check()
+                return
+            except Exception:
+                logger.exception("File watcher failed, falling back to polling")
+
+        self.mode = 'polling'
+        while not self._stop.wait(self.poll_interval):
+            self.check()
+
+    def _watch_roots(self) -> List[str]:
+        """Directories directly holding the stores, shards and txt files.
+
+        They are watched without recursing: the txt files usually sit in the
+        working directory, and everything else below it (the namespaces root
+        included) must not wake this watcher.
+        """
+        dirs = {self._data_dir, *(path.parent for path in self._txt_paths)}
+        if self.file_manager.partitioned:
+            dirs.update(self._shards_dir / kind for kind in SHARD_FIELDS)
+        return sorted(str(d) for d in dirs if d.is_dir())
+
+    def _is_relevant(self, change, path: str) -> bool:
+        path = Path(path)
+        if path in self._txt_paths:
+            return True
+        return path.suffix == '.json' and (path.parent == self._data_dir or path.parent.parent == self._shards_dir)
+
+    def check(self):
+        """Process every watched file that changed since the last check"""
+        with self._check_lock:
+            store_files = self.file_manager.store_files()
+            for path, location in store_files.items():
+                if self._changed(path):
+                    self._check_store(path, location)
+
+            for path in [path for path in self._locations if path not in store_files]:
+                self._check_removed_shard(path)
+
+            for kind, path in self.file_manager.txt_files.items():
+                if self._changed(path):
+                    self._check_txt(kind, path)
+
+    def _changed(self, path: Path) -> bool:
+        signature = file_signature(path)
+        if self._signatures.get(path) == signature:
+            return False
+        self._signatures[path] = signature
+        return True
+
+    def _take_snapshot(self, path: Path, location: tuple):
+        kind, _ = location
+        self._locations[path] = location
+        try:
+            self._remember(path, self.file_manager.parse_store_file(kind, path))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def _remember(self, path: Path, data):
+        self._last_good[path] = data
+        self._sizes[path] = estimate_size(data)
+
+    def _records(self, path: Path) -> Dict[str, dict]:
+        """{id: record} of the last good contents of a store file"""
+        data = self._last_good.get(path)
+        return {symbol.id: symbol.dict() for symbol in data.symbols} if data is not None else {}
+
+    def _check_store(self, path: Path, location: tuple):
+        kind, shard = location
+        own_write = is_own_write(path)
+
+        with self.file_manager.store_lock(kind, shard):
+            try:
+                data = self.file_manager.parse_store_file(kind, path)
+            except FileNotFoundError:
+                return
+            except ValueError as e:
+                # Also covers json.JSONDecodeError and pydantic validation errors
+                self.stats['errors'] += 1
+                logger.warning("Ignoring invalid store file %s: %s", path, e)
+                return
+
+            records = {symbol.id: symbol.dict() for symbol in data.symbols}
+            changes = _diff(self._records(path), records)
+            if not any(changes.values()):
+                return
+
+            if not own_write:
+                # Treat the edit like an API write: bump version, back up, regenerate txt.
+                # The edit is already on disk, so back up the last good contents instead.
+                self.file_manager.write_store(kind, data, shard, previous=self._last_good.get(path))
+                self._signatures[path] = file_signature(path)
+            self._remember(path, data)
+            self._locations[path] = location
+
+        self.stats['own_writes' if own_write else 'external_edits'] += 1
+        self._notify(kind, shard, 'api' if own_write else 'external', changes)
+
+    def _check_removed_shard(self, path: Path):
+        kind, shard = self._locations.pop(path)
+        records = self._records(path)
+        last_good = self._last_good.pop(path, None)
+        self._sizes.pop(path, None)
+        last_version = last_good.version if last_good is not None else 0
+        self._signatures.pop(path, None)
+
+        with self.file_manager.store_lock(kind, shard):
+            self.file_manager.drop_shard(kind, shard, last_version)
+
+        self.stats['external_edits'] += 1
+        self._notify(kind, shard, 'external', _diff(records, {}))
+
+    def _check_txt(self, kind: str, path: Path):
+        if is_own_write(path) or not path.exists():
+            return
+        if not self.ingest_txt:
+            logger.info("%s was edited outside the API and will be regenerated on the next write", path)
+            return
+
+        # Editors and scripts often truncate and then write; wait for the file to
+        # settle. If it changed meanwhile, the next check picks up the new version.
+        signature = file_signature(path)
+        time.sleep(self.settle_delay)
+        if file_signature(path) != signature:
+            return
+
+        try:
+            records = _parse_txt(kind, path.read_text())
+        except ValueError as e:
+            self.stats['errors'] += 1
+            logger.warning("Not ingesting %s: %s", path, e)
+            return
+
+        if not records:
+            self.stats['txt_refused'] += 1
+            logger.warning("Not ingesting %s: the file has no entries", path)
+            return
+
+        with self.file_manager.store_lock(kind):
+            data = getattr(self.file_manager, f'read_{kind}_data')()
+            existing = {_txt_key(kind, symbol.dict()): symbol for symbol in data.symbols}
+            now = datetime.now().isoformat()
+
+            symbols = []
+            try:
+                for record in records:
+                    match = existing.pop(_txt_key(kind, record), None)
+                    if match is None:
+                        symbols.append(SYMBOL_MODELS[kind](id=str(uuid.uuid4()), created_at=now, updated_at=now, **record))
+                        continue
+
+                    candidate = SYMBOL_MODELS[kind](id=match.id, created_at=match.created_at, updated_at=now, **record)
+                    if self.file_manager.format_txt_line(kind, candidate) == self.file_manager.format_txt_line(kind, match):
+                        symbols.append(match)
+                    else:
+                        symbols.append(candidate)
+            except ValueError as e:
+                self.stats['errors'] += 1
+                logger.warning("Not ingesting %s: %s", path, e)
+                return
+
+            changes = _diff(
+                {symbol.id: symbol.dict() for symbol in data.symbols},
+                {symbol.id: symbol.dict() for symbol in symbols}
+            )
+            if not any(changes.values()):
+                return
+
+            if (not self.allow_mass_removal and data.symbols
+                    and len(changes['removed']) > self.max_removed_fraction * len(data.symbols)):
+                self.stats['txt_refused'] += 1
+                logger.warning(
+                    "Not ingesting %s: it would remove %d of %d %s symbols",
+                    path, len(changes['removed']), len(data.symbols), kind
+                )
+                return
+
+            lines = {symbol.id: self.file_manager.format_txt_line(kind, symbol) for symbol in data.symbols + symbols}
+            logger.info(
+                "Ingesting %s: added %s, updated %s, removed %s", path,
+                [lines[symbol_id] for symbol_id in changes['added']],
+                [lines[symbol_id] for symbol_id in changes['updated']],
+                [lines[symbol_id] for symbol_id in changes['removed']]
+            )
+
+            data.symbols = symbols
+            self.file_manager.write_store(kind, data)
+
+            # Absorb the resulting store writes so they are not reported a second time
+            for store_path, location in self.file_manager.store_files().items():
+                if location[0] == kind:
+                    self._signatures[store_path] = file_signature(store_path)
+                    self._take_snapshot(store_path, location)
+
+        self.stats['txt_ingests'] += 1
+        self._notify(kind, None, 'txt', changes)
+
+    def _notify(self, kind: str, shard: Optional[str], source: str, changes: Dict[str, List[str]]):
+        event = {
+            'store': kind,
+            'shard': shard,
+            'source': source,
+            'version': getattr(self.file_manager, f'read_{kind}_data')().version,
+            **changes
+        }
+        for callback in list(self._subscribers):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Store watcher subscriber failed")
+
+
+class SharedWatcher:
+    """One background thread driving the StoreWatchers of every directory under root.
+
+    Each StoreWatcher is registered under the name of its directory below
+    root, and changes are routed to the watcher of the directory they are in.
+    Any number of directories share a single thread and inotify instance;
+    changes in directories without a registered watcher are ignored.
+    """
+
+    def __init__(self, root: str, poll_interval: float = 1.0):
+        self.root = Path(root)
+        self.poll_interval = poll_interval
+        self.mode: Optional[str] = None
+        self._watchers: Dict[str, StoreWatcher] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def add(self, name: str, watcher: StoreWatcher):
+        """Route changes under root/name to watcher, which must already be snapshotted"""
+        watcher.shared = self
+        with self._lock:
+            self._watchers[name] = watcher
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="shared-store-watcher", daemon=True)
+                self._thread.start()
+
+    def remove(self, name: str):
+        with self._lock:
+            watcher = self._watchers.pop(name, None)
+        if watcher is not None:
+            watcher.shared = None
+
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _run(self):
+        root = self.root.resolve()
+        if watchfiles is not None:
+            try:
+                self.mode = 'inotify'
+                for changes in watchfiles.watch(
+                    root,
+                    watch_filter=lambda change, path: self._is_relevant(root, change, path),
+                    stop_event=self._stop,
+                    raise_interrupt=False
+                ):
+                    for name in sorted({self._name_of(root, path) for _, path in changes}):
+                        self._check(self._watchers.get(name))
+                return
+            except Exception:
+                logger.exception("Shared file watcher failed, falling back to polling")
+
+        self.mode = 'polling'
+        while not self._stop.wait(self.poll_interval):
+            for watcher in list(self._watchers.values()):
+                self._check(watcher)
+
+    def _name_of(self, root: Path, path: str) -> Optional[str]:
+        parts = Path(path).relative_to(root).parts
+        return parts[0] if parts else None
+
+    def _is_relevant(self, root: Path, change, path: str) -> bool:
+        watcher = self._watchers.get(self._name_of(root, path))
+        return watcher is not None and watcher._is_relevant(change, path)
+
+    def _check(self, watcher: Optional[StoreWatcher]):
+        # One failing directory must not stop the others from being watched
+        if watcher is None:
+            return
+        try:
+            watcher.check()
+        except Exception:
+            watcher.stats['errors'] += 1
+            logger.exception("Store watcher check failed for %s", watcher.file_manager.data_dir)
@@ -0,0 +1,152 @@
+"""Benchmark lazy, LRU-bounded namespace loading against loading every namespace.
+
+Run from the backend directory:
+
+    python -m benchmarks.namespaces_benchmark [--namespaces 300] [--symbols 200] [--active 10]
+
+Builds a temporary tree of namespaces, then reports startup time and the
+memory held after serving requests that touch only the active set, both for
+NamespaceRegistry and for an eager process that loads every namespace. Both
+watch their loaded namespaces for external edits, as the API does.
+"""
+import argparse
+import gc
+import json
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.utils.file_manager import FileManager
+from app.utils.namespaces import NamespaceRegistry
+from app.utils.watcher import SharedWatcher, StoreWatcher
+
+EXCHANGES = ['binance', 'bybit', 'okx', 'bitget', 'kraken', 'kucoin']
+
+
+def _ticker(i: int) -> str:
+    """Distinct letters-only ticker for index i"""
+    letters = ''
+    for _ in range(4):
+        i, digit = divmod(i, 26)
+        letters += chr(ord('A') + digit)
+    return letters
+
+
+def build_tree(root: Path, namespaces: int, symbols: int):
+    now = datetime.now().isoformat()
+    for n in range(namespaces):
+        data_dir = root / f"ns{n}" / "data"
+        data_dir.mkdir(parents=True)
+        cex = [
+            {
+                'id': str(uuid.uuid4()),
+                'ticker_name': _ticker(i),
+                'exchange_name': EXCHANGES[i % len(EXCHANGES)],
+                'symbol': f"SYM{i}USDT",
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(symbols)
+        ]
+        futures = [
+            {
+                'id': str(uuid.uuid4()),
+                'symbol': 'BTC',
+                'ticker': f"BTC{i}",
+                'exchange': EXCHANGES[i % len(EXCHANGES)],
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(symbols)
+        ]
+        for name, records in [('cex_symbols', cex), ('futures_symbols', futures), ('dex_symbols', [])]:
+            with open(data_dir / f"{name}.json", 'w') as f:
+                json.dump({'symbols': records, 'last_updated': now, 'version': 1}, f)
+
+
+def serve(get, names, active, requests):
+    """Serve requests that mostly hit the active set, with the odd cold namespace"""
+    rng = random.Random(0)
+    hot = names[:active]
+    for _ in range(requests):
+        name = rng.choice(hot) if rng.random() < 0.95 else rng.choice(names)
+        file_manager = get(name)
+        file_manager.read_cex_data()
+        file_manager.read_futures_data()
+
+
+def measure(label, setup, names, active, requests):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    get, holder = setup()
+    startup = time.perf_counter() - started
+
+    started = time.perf_counter()
+    serve(get, names, active, requests)
+    elapsed = time.perf_counter() - started
+
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} startup {startup * 1000:9.1f} ms   serve {elapsed * 1000:8.1f} ms   "
+          f"held {current / 1024 / 1024:7.1f} MiB   peak {peak / 1024 / 1024:7.1f} MiB   "
+          f"threads {threading.active_count()}")
+    return holder
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--namespaces', type=int, default=300)
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--active', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=500)
+    # Roughly the active set, counting cached stores and watcher snapshots:
+    # cold namespaces have to be evicted to stay within it
+    parser.add_argument('--budget-mb', type=float, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "namespaces"
+        build_tree(root, args.namespaces, args.symbols)
+        names = [f"ns{n}" for n in range(args.namespaces)]
+        print(f"{args.namespaces} namespaces x {args.symbols} symbols, {args.active} active, "
+              f"{args.requests} requests, budget {args.budget_mb} MiB\n")
+
+        def lazy():
+            registry = NamespaceRegistry(
+                root=str(root),
+                memory_budget=int(args.budget_mb * 1024 * 1024),
+                watcher_factory=StoreWatcher
+            )
+            return registry.get, registry
+
+        def eager():
+            loaded = {}
+            shared_watcher = SharedWatcher(str(root))
+            for name in names:
+                file_manager = FileManager(data_dir=str(root / name / "data"), output_dir=str(root / name), sync_txt=False)
+                file_manager.read_cex_data()
+                file_manager.read_futures_data()
+                watcher = StoreWatcher(file_manager)
+                watcher.snapshot()
+                shared_watcher.add(name, watcher)
+                loaded[name] = file_manager
+            return loaded.__getitem__, shared_watcher
+
+        registry = measure("lazy+LRU", lazy, names, args.active, args.requests)
+        registry.close()
+        measure("eager", eager, names, args.active, args.requests).stop()
+
+        print(f"\nregistry: {len(registry.status()['loaded'])} loaded, "
+              f"{registry.loaded_bytes() / 1024 / 1024:.1f} MiB of stores and snapshots (estimated), "
+              f"{registry.stats['loads']} loads, {registry.stats['evictions']} evictions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+import uuid
+from datetime import datetime
+
+from app.models.symbols import CEXData, CEXSymbol
+from app.utils.file_manager import FileManager
+
+
+def make_store(file_manager, count):
+    now = datetime.now().isoformat()
+    symbols = [
+        CEXSymbol(id=str(uuid.uuid4()), ticker_name=f"T{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}",
+                  exchange_name='binance', symbol=f"SYM{i}", created_at=now, updated_at=now)
+        for i in range(count)
+    ]
+    file_manager.write_cex_data(CEXData(symbols=symbols, last_updated=now, version=1))
+
+
+def best_of(fn, runs=5):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_shared_read_is_cheaper_than_a_fresh_load(tmp_path):
+    file_manager = FileManager(data_dir=str(tmp_path / "data"), output_dir=str(tmp_path))
+    make_store(file_manager, 2000)
+    file_manager.read_cex_data()
+
+    cached = best_of(file_manager.read_cex_data)
+    fresh = best_of(file_manager._load_cex_data)
+
+    assert cached * 5 < fresh
+
+
+def test_reads_do_not_share_the_symbols_list(tmp_path):
+    file_manager = FileManager(data_dir=str(tmp_path / "data"), output_dir=str(tmp_path))
+    make_store(file_manager, 3)
+
+    data = file_manager.read_cex_data()
+    data.symbols.pop()
+    data.version += 10
+
+    again = file_manager.read_cex_data()
+    assert len(again.symbols) == 3
+    assert again.version == data.version - 10
@@ -0,0 +1,97 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.utils.namespaces import NamespaceRegistry
+from app.utils.watcher import StoreWatcher
+
+
+def test_missing_namespace_is_not_created(tmp_path):
+    registry = NamespaceRegistry(root=str(tmp_path))
+
+    with pytest.raises(KeyError):
+        registry.get("typo")
+    assert not (tmp_path / "typo").exists()
+
+    registry.create("strategy")
+    with pytest.raises(FileExistsError):
+        registry.create("strategy")
+    assert registry.get("strategy").read_cex_data().symbols == []
+
+
+def test_lazy_load_does_not_rewrite_txt_files(tmp_path):
+    NamespaceRegistry(root=str(tmp_path)).create("strategy")
+    txt_file = tmp_path / "strategy" / "cex_symbols.txt"
+    os.utime(txt_file, ns=(0, 0))
+
+    NamespaceRegistry(root=str(tmp_path)).get("strategy").read_cex_data()
+
+    assert txt_file.stat().st_mtime_ns == 0
+
+
+def test_least_recently_used_namespaces_are_evicted(tmp_path):
+    registry = NamespaceRegistry(root=str(tmp_path))
+    for name in ["a", "b", "c"]:
+        file_manager = registry.create(name)
+        file_manager.add_cex_symbol({'ticker_name': 'BTC', 'exchange_name': 'binance', 'symbol': 'BTCUSDT'})
+        file_manager.read_cex_data()
+
+    # Room for roughly two namespaces' worth of cached stores
+    registry.memory_budget = registry.loaded_bytes() * 2 // 3
+    registry.get("a")
+    registry.get("c")
+
+    assert registry.status()['loaded'] == ["a", "c"]
+    assert registry.stats['evictions'] == 1
+    assert registry.loaded_bytes() <= registry.memory_budget
+
+
+def test_watched_namespaces_share_one_thread_and_count_snapshots(tmp_path):
+    registry = NamespaceRegistry(root=str(tmp_path), watcher_factory=StoreWatcher)
+    threads = threading.active_count()
+    for n in range(20):
+        registry.create(f"ns{n}")
+
+    assert threading.active_count() <= threads + 1
+    # Nothing was read, but the watchers hold a snapshot of every store
+    assert registry.loaded_bytes() > 0
+
+    registry.memory_budget = registry.loaded_bytes() // 2
+    registry.get("ns0")
+    assert 1 <= len(registry.status()['loaded']) <= 10
+    assert registry.loaded_bytes() <= registry.memory_budget
+    assert registry.watcher("ns1") is None
+    registry.close()
+
+
+def test_max_loaded_bounds_open_namespaces(tmp_path):
+    registry = NamespaceRegistry(root=str(tmp_path), max_loaded=2)
+    for name in ["a", "b", "c"]:
+        registry.create(name)
+
+    assert registry.status()['loaded'] == ["b", "c"]
+
+
+def test_shared_watcher_picks_up_edits_in_loaded_namespaces(tmp_path):
+    registry = NamespaceRegistry(root=str(tmp_path), watcher_factory=lambda fm: StoreWatcher(fm, poll_interval=0.1))
+    file_manager = registry.create("team")
+    file_manager.add_cex_symbol({'ticker_name': 'BTC', 'exchange_name': 'binance', 'symbol': 'BTCUSDT'})
+    registry.create("other")
+
+    data = json.loads(file_manager.cex_file.read_text())
+    data['symbols'][0]['symbol'] = 'XBTUSDT'
+    file_manager.cex_file.write_text(json.dumps(data))
+
+    watcher = registry.watcher("team")
+    for _ in range(100):
+        if watcher.stats['external_edits']:
+            break
+        time.sleep(0.1)
+    registry.close()
+
+    assert watcher.stats['external_edits'] == 1
+    assert registry.watcher("other").stats['external_edits'] == 0
+    assert file_manager.cex_symbols_file.read_text() == "BTC:binance:XBTUSDT"
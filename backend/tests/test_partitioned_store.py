@@ -0,0 +1,138 @@
+import threading
+
+from app.utils.file_manager import FileManager
+
+
+def make_cex(file_manager, exchanges):
+    for exchange in exchanges:
+        file_manager.add_cex_symbol({'ticker_name': 'BTC', 'exchange_name': exchange, 'symbol': 'BTCUSDT'})
+
+
+def test_migration_keeps_merged_version(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    legacy = FileManager(partitioned=False)
+    make_cex(legacy, ['binance', 'kraken', 'okx'])
+    version = legacy.read_cex_data().version
+
+    legacy.migrate_to_partitioned()
+    file_manager = FileManager()
+
+    assert file_manager.partitioned
+    assert file_manager.read_cex_data().version == version
+    make_cex(file_manager, ['bybit'])
+    assert file_manager.read_cex_data().version > version
+
+
+def test_shard_backups_do_not_prune_prefixed_shards(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager(partitioned=True)
+    backups_dir = file_manager.shard_backups_dir / 'cex'
+    for i in range(10):
+        (backups_dir / f"gate_20250101_1200{i:02d}.json").write_text('{}')
+        (backups_dir / f"gate_io_20250101_1200{i:02d}.json").write_text('{}')
+
+    file_manager.add_cex_symbol({'ticker_name': 'BTC', 'exchange_name': 'gate', 'symbol': 'BTCUSDT'})
+    file_manager.add_cex_symbol({'ticker_name': 'ETH', 'exchange_name': 'gate', 'symbol': 'ETHUSDT'})
+
+    assert len(list(backups_dir.glob("gate_io_*.json"))) == 10
+    assert len(list(backups_dir.glob("gate_2*.json"))) == 10
+
+
+def dex(dex_type, address="0x" + "ab" * 20):
+    return {'dex_type': dex_type, 'pool_address': address, 'pool_name': 'pepe/weth', 'altcoin_quantity': 1}
+
+
+def test_pool_address_is_unique_across_concurrent_shard_adds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager(partitioned=True)
+    dex_types = ['uniswap_v2', 'uniswap_v3', 'sushiswap_v2', 'sushiswap_v3'] * 2
+    barrier = threading.Barrier(len(dex_types))
+    added, errors = [], []
+
+    def add(dex_type):
+        barrier.wait()
+        try:
+            added.append(file_manager.add_dex_symbol(dex(dex_type)))
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(dex_type,)) for dex_type in dex_types]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(added) == 1
+    assert len(errors) == len(dex_types) - 1
+    assert len(file_manager.read_dex_data().symbols) == 1
+
+
+def test_adds_to_different_shards_write_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager(partitioned=True)
+    # Both writers must be inside _write_shard at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    write_shard = file_manager._write_shard
+
+    def both_writing(*args, **kwargs):
+        barrier.wait()
+        return write_shard(*args, **kwargs)
+
+    monkeypatch.setattr(file_manager, '_write_shard', both_writing)
+    errors = []
+
+    def add(dex_type, address):
+        try:
+            file_manager.add_dex_symbol(dex(dex_type, address))
+        except threading.BrokenBarrierError as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=add, args=('uniswap_v2', "0x" + "01" * 20)),
+        threading.Thread(target=add, args=('sushiswap_v3', "0x" + "02" * 20))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(file_manager.read_dex_data().symbols) == 2
+
+
+def test_moving_a_symbol_between_shards_never_lists_it_twice(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager(partitioned=True)
+    symbol = file_manager.add_cex_symbol({'ticker_name': 'BTC', 'exchange_name': 'binance', 'symbol': 'BTCUSDT'})
+    write_shard = file_manager._write_shard
+    seen = []
+
+    def record(*args, **kwargs):
+        write_shard(*args, **kwargs)
+        seen.append(sum(s.id == symbol.id for s in file_manager.read_cex_data().symbols))
+        seen.append(file_manager.cex_symbols_file.read_text().count('BTC:'))
+
+    monkeypatch.setattr(file_manager, '_write_shard', record)
+    file_manager.update_cex_symbol(symbol.id, {'ticker_name': 'BTC', 'exchange_name': 'kraken', 'symbol': 'XBTUSD'})
+
+    assert max(seen) == 1
+    assert [(s.id, s.exchange_name) for s in file_manager.read_cex_data().symbols] == [(symbol.id, 'kraken')]
+    assert file_manager.cex_symbols_file.read_text() == "BTC:kraken:XBTUSD"
+
+
+def test_reverse_migration_keeps_writes_made_after_migrating(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    legacy = FileManager(partitioned=False)
+    make_cex(legacy, ['binance'])
+    legacy.migrate_to_partitioned()
+
+    file_manager = FileManager()
+    make_cex(file_manager, ['kraken'])
+    version = file_manager.read_cex_data().version
+    file_manager.migrate_to_single_file()
+
+    single = FileManager()
+    assert not single.partitioned
+    assert sorted(s.exchange_name for s in single.read_cex_data().symbols) == ['binance', 'kraken']
+    assert single.read_cex_data().version == version
+    assert single.cex_symbols_file.read_text() == "BTC:binance:BTCUSDT\nBTC:kraken:BTCUSDT"
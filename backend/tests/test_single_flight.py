@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+def run_concurrently(flight, key, fn, callers):
+    """Start `callers` threads that all call flight.do(key, fn)"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn, group="test"))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def wait_for_followers(flight, followers):
+    """Block until followers callers have joined the in-flight call"""
+    for _ in range(1000):
+        if flight.get_stats().get("test", {}).get("coalesced") == followers:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("callers never joined the in-flight call")
+
+
+def test_concurrent_callers_share_one_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fn():
+        executions.append(1)
+        release.wait(5)
+        return object()
+
+    threads, results, errors = run_concurrently(flight, "key", fn, 8)
+    wait_for_followers(flight, 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(executions) == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
+    assert flight.get_stats()["test"] == {"executions": 1, "coalesced": 7, "requests": 8}
+
+
+def test_concurrent_callers_share_one_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fn():
+        release.wait(5)
+        raise ValueError("boom")
+
+    threads, results, errors = run_concurrently(flight, "key", fn, 4)
+    wait_for_followers(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == []
+    assert len(errors) == 4 and all(str(e) == "boom" for e in errors)
+
+
+def test_key_is_released_after_completion():
+    flight = SingleFlight()
+
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.in_flight() == 0
+    assert flight.do("key", lambda: 2) == 2
+
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.in_flight() == 0
+    assert flight.do("key", lambda: 3) == 3
+    assert flight.get_stats()["default"]["executions"] == 4
@@ -0,0 +1,70 @@
+import json
+import time
+
+from app.utils.file_manager import FileManager
+from app.utils.watcher import StoreWatcher
+
+
+def make_watcher(tmp_path, monkeypatch, **kwargs):
+    monkeypatch.chdir(tmp_path)
+    file_manager = FileManager()
+    for ticker, exchange in [('BTC', 'binance'), ('ETH', 'okx'), ('SOL', 'kraken')]:
+        file_manager.add_cex_symbol({'ticker_name': ticker, 'exchange_name': exchange, 'symbol': f"{ticker}USDT"})
+    watcher = StoreWatcher(file_manager, settle_delay=0, **kwargs)
+    watcher.snapshot()
+    return file_manager, watcher
+
+
+def test_truncated_txt_is_not_ingested(tmp_path, monkeypatch):
+    file_manager, watcher = make_watcher(tmp_path, monkeypatch, ingest_txt=True)
+
+    open("cex_symbols.txt", "w").close()
+    watcher.check()
+    assert len(file_manager.read_cex_data().symbols) == 3
+
+    with open("cex_symbols.txt", "w") as f:
+        f.write("BTC:binance:BTCUSDT")
+    watcher.check()
+    assert len(file_manager.read_cex_data().symbols) == 3
+    assert watcher.stats['txt_refused'] == 2
+
+
+def test_txt_edit_is_ingested(tmp_path, monkeypatch):
+    file_manager, watcher = make_watcher(tmp_path, monkeypatch, ingest_txt=True)
+
+    with open("cex_symbols.txt", "w") as f:
+        f.write("BTC:binance:BTCUSDT\nETH:okx:ETHPERP\nSOL:kraken:SOLUSDT\nADA:okx:ADAUSDT")
+    watcher.check()
+
+    symbols = {symbol.ticker_name: symbol.symbol for symbol in file_manager.read_cex_data().symbols}
+    assert symbols == {'BTC': 'BTCUSDT', 'ETH': 'ETHPERP', 'SOL': 'SOLUSDT', 'ADA': 'ADAUSDT'}
+
+
+def test_external_edit_backs_up_previous_contents(tmp_path, monkeypatch):
+    file_manager, watcher = make_watcher(tmp_path, monkeypatch)
+    # Backups are named per second; keep the edit's backup apart from earlier ones
+    time.sleep(1.1)
+
+    with open(file_manager.cex_file) as f:
+        data = json.load(f)
+    data['symbols'][0]['ticker_name'] = 'DOGE'
+    with open(file_manager.cex_file, 'w') as f:
+        json.dump(data, f)
+    watcher.check()
+
+    latest = sorted(file_manager.backups_dir.glob("cex_symbols_*.json"))[-1]
+    with open(latest) as f:
+        backed_up = [symbol['ticker_name'] for symbol in json.load(f)['symbols']]
+    assert backed_up == ['BTC', 'ETH', 'SOL']
+    assert file_manager.read_cex_data().symbols[0].ticker_name == 'DOGE'
+
+
+def test_default_watcher_ignores_directories_below_the_txt_files(tmp_path, monkeypatch):
+    file_manager, watcher = make_watcher(tmp_path, monkeypatch)
+    namespace_store = tmp_path / "namespaces" / "team" / "data" / "cex_symbols.json"
+
+    assert str(tmp_path / "namespaces") not in watcher._watch_roots()
+    assert not watcher._is_relevant(None, str(namespace_store))
+    assert not watcher._is_relevant(None, str(tmp_path / "data" / "backups" / "cex_symbols_20250101_120000.json"))
+    assert watcher._is_relevant(None, str(tmp_path / "data" / "cex_symbols.json"))
+    assert watcher._is_relevant(None, str(tmp_path / "cex_symbols.txt"))